@@ -9,15 +9,26 @@ automatically approves them when a Claude window is in focus.
 import os
 import sys
 import time
+import shutil
 import signal
 import threading
 import json
+import zlib
+import ctypes
+import ctypes.util
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Iterator
 import subprocess
 
-import pyautogui
-from PIL import Image
+import cv2
+import mss
+from mss.exception import ScreenShotError
+import numpy as np
+from PIL import Image, ImageDraw
+from Xlib import X, XK, Xatom
+from Xlib import display as xdisplay
+from Xlib.error import ConnectionClosedError
 
 # Try to import AppIndicator3 for Ubuntu top bar integration
 try:
@@ -30,16 +41,45 @@ except (ImportError, ValueError):
     HAS_INDICATOR = False
     print("Warning: AppIndicator3 not available. Running without system tray.")
 
+# Numba is optional and speeds up EXACT_MATCH
+try:
+    import numba
+    from numba import prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    prange = range
+
+# xxhash makes the unchanged-frame check cheaper; zlib's CRC-32 does the job without it
+try:
+    import xxhash
+    hash_frame = xxhash.xxh3_64_intdigest
+except ImportError:
+    hash_frame = zlib.crc32
+
 # ============================================================================
 # CONFIGURATION - Adjust these values as needed
 # ============================================================================
 
 # Timing configuration
 SCAN_INTERVAL_MS = 300      # Check every 300ms
+MAX_SCAN_INTERVAL_MS = 2000 # Slowest interval when idle
+IDLE_BACKOFF_TICKS = 10     # Empty scans before the interval starts growing
+IDLE_BACKOFF_FACTOR = 1.5   # Interval growth per further empty scan
 COOLDOWN_SECONDS = 0.5      # Wait 0.5 seconds after sending Enter
 
 # Image matching
 CONFIDENCE_THRESHOLD = 0.9  # Matching confidence (0.0 to 1.0)
+PYRAMID_LEVELS = 2          # Coarse search at 1/4 resolution (each level halves)
+COARSE_CONFIDENCE_THRESHOLD = 0.75  # Relaxed confidence for the coarse search
+GREEN_AS_GRAY = False       # Match on the green channel instead of converting to luma
+
+# Exact matching - for pixel-exact button crops, require every pixel to be
+# within a tolerance instead of using normalized correlation. Stricter and
+# faster, but needs reference images taken at the current theme and scaling
+EXACT_MATCH = False
+EXACT_MATCH_TOLERANCE = 8   # Allowed difference per pixel (0-255)
+EXACT_PREFILTER_PROBES = 5  # Pixels checked at every position before a full compare
 
 # Sound
 SOUND_ENABLED = False  # Play sound on auto-approval
@@ -52,6 +92,16 @@ CONFIG_FILE = CONFIG_DIR / "config.json"
 # Claude window detection - window title prefix
 CLAUDE_WINDOW_PREFIX = "✳"
 
+# Default scan area - permission prompts appear at the bottom of the Claude
+# window, so only a strip of this height (measured from the bottom) is
+# scanned. It grows to 4x the tallest reference image if that is taller
+PROMPT_HEIGHT_PX = 400
+FULL_WINDOW_SCAN_MISSES = 20  # Every this many empty scans, one scan covers the whole window
+
+# MSS and Xlib handles are bound to the thread that created them, so each
+# thread lazily gets its own (see get_screen_grabber / get_x_display)
+_thread_local = threading.local()
+
 # ============================================================================
 # GLOBAL STATE
 # ============================================================================
@@ -60,14 +110,37 @@ class AppState:
     """Global application state."""
     def __init__(self):
         self.running = True
-        self.enabled = False  # Start in 'off' state
+        self.enabled_event = threading.Event()  # Set while auto-approve is on (starts 'off')
         self.paused = False  # True when Claude window not in focus
+        self.focused_event = threading.Event()  # Set while a Claude window is in focus
+        self.focused_event.set()  # Kept in step with paused, which starts False
+        self.focus_events = False  # True while focus_watcher tracks focus from X events
         self.last_approve_time = 0
+        self.idle_ticks = 0  # Consecutive scans without a prompt, drives the backoff
         self.indicator = None
+        self.icon_paths = {}  # color -> icon file path, filled by ensure_icons_exist
+        self.indicator_color = None  # Color the indicator icon currently shows
+        self.icon_update_pending = False  # An icon update is queued on the GTK main loop
+        self.menu_update_pending = False  # A capture area label update is queued
         self.status_item = None
         self.toggle_item = None  # Reference to toggle menu item
         self.capture_area_item = None
         self.custom_region = None  # (x, y, width, height) or None for focused window
+        self.auto_window = None  # (x, y, width, height) of the focused Claude window, kept by focus_watcher
+        self.full_window_scan = False  # Scan the whole focused window rather than its prompt strip
+        self.scan_region = None  # Region the cached monitor below was built for
+        self.monitor = None  # MSS monitor dict for scan_region, reused across grabs
+        self.last_frame_hash = None  # Hash of the last grab that had no prompt
+        self.result_bufs = {}  # (region_h, region_w, tmpl_h, tmpl_w) -> matchTemplate result array
+        self.scan_bufs = {}  # (role, ...shape) -> scratch array for the gray screen and its pyramid
+        self.capture_reported = False  # Whether the capture path has been logged
+        self.sound_path = None  # Approval sound file, resolved by setup_sound
+        self.canberra = None  # (libcanberra, context) used to play it, or None for paplay
+        self.templates = []  # (name, grayscale template pyramid) pairs, see load_templates
+        self.template_groups = []  # state.templates bucketed by size, see group_templates
+        self.pyramid_levels = 0  # Deepest pyramid level any template uses
+        self.exact_match = False  # EXACT_MATCH enabled and probes built
+        self.exact_probes = []  # Per-template probe pixels for EXACT_MATCH, see exact_probes
         self.lock = threading.Lock()
 
 state = AppState()
@@ -79,8 +152,11 @@ state = AppState()
 def toggle_enabled():
     """Toggle the enabled state. Called from menu."""
     with state.lock:
-        state.enabled = not state.enabled
-        enabled = state.enabled
+        enabled = not state.enabled_event.is_set()
+        if enabled:
+            state.enabled_event.set()
+        else:
+            state.enabled_event.clear()
 
     status = "enabled" if enabled else "disabled"
     print(f"[{time.strftime('%H:%M:%S')}] Auto-approve {status}")
@@ -131,17 +207,20 @@ def load_custom_region():
 # ============================================================================
 
 def create_circle_icon(color: str, size: int = 22) -> str:
-    """Create a circle icon and save it to config directory."""
+    """Create a circle icon in the config directory, reusing one from a previous run."""
     icons_dir = CONFIG_DIR / "icons"
     icons_dir.mkdir(parents=True, exist_ok=True)
 
-    icon_path = icons_dir / f"circle_{color}.png"
+    icon_path = icons_dir / f"circle_{color}_{size}.png"
+    if icon_path.exists() and icon_path.stat().st_size > 0:
+        return str(icon_path)
 
-    # Create a simple circle icon using PIL
-    img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    # Draw at 4x and downsample for smooth, antialiased edges
+    scale = 4
+    canvas = size * scale
+    img = Image.new('RGBA', (canvas, canvas), (0, 0, 0, 0))
 
     # Draw a filled circle
-    from PIL import ImageDraw
     draw = ImageDraw.Draw(img)
 
     colors = {
@@ -153,17 +232,25 @@ def create_circle_icon(color: str, size: int = 22) -> str:
     fill_color = colors.get(color, colors['red'])
 
     # Draw circle with a slight border
-    margin = 2
-    draw.ellipse([margin, margin, size - margin - 1, size - margin - 1],
-                 fill=fill_color, outline=(50, 50, 50, 255))
+    margin = 2 * scale
+    draw.ellipse([margin, margin, canvas - margin - 1, canvas - margin - 1],
+                 fill=fill_color, outline=(50, 50, 50, 255), width=scale)
 
+    img = img.resize((size, size), Image.LANCZOS)
     img.save(str(icon_path))
     return str(icon_path)
 
 def ensure_icons_exist():
-    """Create all necessary icons."""
+    """Create all necessary icons and remember their paths."""
     for color in ['green', 'yellow', 'red']:
-        create_circle_icon(color)
+        state.icon_paths[color] = create_circle_icon(color)
+
+# Status menu text shown alongside each icon color
+STATUS_TEXTS = {
+    'red': "Status: Disabled",
+    'yellow': "Status: Paused (Claude not focused)",
+    'green': "Status: Active",
+}
 
 # ============================================================================
 # REFERENCE IMAGE MANAGEMENT
@@ -174,12 +261,77 @@ def get_reference_images() -> List[Path]:
     if not IMAGES_DIR.exists():
         return []
 
-    images = []
-    for ext in ['*.png', '*.jpg', '*.jpeg', '*.bmp']:
-        images.extend(IMAGES_DIR.glob(ext))
+    # One directory pass; also picks up upper-case extensions like .PNG
+    extensions = {'.png', '.jpg', '.jpeg', '.bmp'}
+    with os.scandir(IMAGES_DIR) as entries:
+        images = [Path(entry.path) for entry in entries
+                  if entry.is_file() and os.path.splitext(entry.name)[1].lower() in extensions]
 
     return sorted(images)
 
+def reuse_buffer(bufs: Dict[tuple, np.ndarray], key: tuple, shape: tuple,
+                 dtype=np.float32) -> np.ndarray:
+    """Get the scratch array cached under key, allocating it on first use."""
+    buf = bufs.get(key)
+    if buf is None:
+        buf = bufs[key] = np.empty(shape, dtype)
+    return buf
+
+def build_pyramid(image: np.ndarray, levels: int, min_size: int = 1,
+                  bufs: Optional[Dict[tuple, np.ndarray]] = None) -> List[np.ndarray]:
+    """
+    Build a Gaussian pyramid, full resolution first.
+    Stops early once a level would drop below min_size pixels on a side.
+    If bufs is given, levels are written into arrays cached there.
+    """
+    pyramid = [image]
+    for level in range(1, levels + 1):
+        h, w = pyramid[-1].shape[:2]
+        if min(h, w) // 2 < min_size:
+            break
+        if bufs is None:
+            pyramid.append(cv2.pyrDown(pyramid[-1]))
+        else:
+            shape = ((h + 1) // 2, (w + 1) // 2)
+            dst = reuse_buffer(bufs, ('pyramid', level) + shape, shape, image.dtype)
+            pyramid.append(cv2.pyrDown(pyramid[-1], dst=dst))
+    return pyramid
+
+def load_templates(reference_images: List[Path]) -> List[Tuple[str, List[np.ndarray]]]:
+    """
+    Decode reference images once so scans don't re-read them from disk.
+    Returns (name, grayscale template pyramid) pairs.
+    """
+    templates = []
+    for ref_image_path in reference_images:
+        tmpl = cv2.imread(str(ref_image_path), cv2.IMREAD_COLOR)
+        if tmpl is None:
+            print(f"Warning: Could not load reference image {ref_image_path.name}")
+            continue
+        # Convert the same way as the screen grab; IMREAD_GRAYSCALE lets the
+        # codec do it (JPEG decodes straight to luma), which can be several
+        # levels off and breaks EXACT_MATCH
+        if GREEN_AS_GRAY:
+            gray = cv2.extractChannel(tmpl, 1)
+        else:
+            gray = cv2.cvtColor(tmpl, cv2.COLOR_BGR2GRAY)
+        # Keep the coarsest level big enough to still carry some structure
+        pyramid = build_pyramid(gray, PYRAMID_LEVELS, min_size=8)
+        # A single-shade level has no defined correlation and would divide
+        # by zero in match_coarse
+        if any(level.std() == 0 for level in pyramid):
+            print(f"Warning: Skipping reference image {ref_image_path.name} (no contrast to match on)")
+            continue
+        templates.append((ref_image_path.name, pyramid))
+    return templates
+
+def group_templates(templates: List[Tuple[str, List[np.ndarray]]]) -> List[List[Tuple[str, List[np.ndarray]]]]:
+    """Bucket templates by size so each bucket can share one screen pass."""
+    groups: Dict[Tuple[int, int], List[Tuple[str, List[np.ndarray]]]] = {}
+    for name, pyramid in templates:
+        groups.setdefault(pyramid[0].shape[:2], []).append((name, pyramid))
+    return list(groups.values())
+
 def setup_reference_images():
     """Interactive setup for reference images."""
     print("\n" + "=" * 60)
@@ -206,7 +358,6 @@ def setup_reference_images():
             path = os.path.expanduser(path)
 
             if os.path.exists(path):
-                import shutil
                 dest = IMAGES_DIR / os.path.basename(path)
                 shutil.copy(path, dest)
                 print(f"Copied to: {dest}")
@@ -239,136 +390,677 @@ def setup_reference_images():
 # SCREEN SCANNING
 # ============================================================================
 
+def get_x_display() -> xdisplay.Display:
+    """Get the X display connection owned by the calling thread."""
+    dpy = getattr(_thread_local, 'display', None)
+    if dpy is None:
+        dpy = _thread_local.display = xdisplay.Display()
+    return dpy
+
+def get_active_window(dpy: xdisplay.Display):
+    """Get the window named by the root window's _NET_ACTIVE_WINDOW, or None."""
+    root = dpy.screen().root
+    prop = root.get_full_property(dpy.get_atom('_NET_ACTIVE_WINDOW'), X.AnyPropertyType)
+    if not prop or not prop.value or not prop.value[0]:
+        return None
+    return dpy.create_resource_object('window', prop.value[0])
+
+def get_window_title(dpy: xdisplay.Display, window) -> Optional[str]:
+    """Get a window's title, preferring the UTF-8 _NET_WM_NAME over WM_NAME."""
+    title = window.get_full_text_property(dpy.get_atom('_NET_WM_NAME'),
+                                          dpy.get_atom('UTF8_STRING'))
+    if title is None:
+        title = window.get_wm_name()
+    return title
+
+def get_window_rect(dpy: xdisplay.Display, window) -> tuple:
+    """Get a window's (x, y, width, height) in root window coordinates."""
+    geometry = window.get_geometry()
+    origin = dpy.screen().root.translate_coords(window, 0, 0)
+    return (origin.x, origin.y, geometry.width, geometry.height)
+
 def get_focused_window_geometry() -> Optional[tuple]:
     """
     Get the geometry of the currently focused window.
     Returns (x, y, width, height) or None if unable to determine.
     """
     try:
-        # Get the active window ID
-        result = subprocess.run(
-            ['xdotool', 'getactivewindow'],
-            capture_output=True,
-            text=True,
-            timeout=1
-        )
-        if result.returncode != 0:
-            return None
-
-        window_id = result.stdout.strip()
-
-        # Get window geometry
-        result = subprocess.run(
-            ['xdotool', 'getwindowgeometry', '--shell', window_id],
-            capture_output=True,
-            text=True,
-            timeout=1
-        )
-        if result.returncode != 0:
+        # Same persistent X connection as the focus check, so no xdotool
+        # process is forked per call
+        dpy = get_x_display()
+        window = get_active_window(dpy)
+        if window is None:
             return None
-
-        # Parse output like: X=100\nY=200\nWIDTH=800\nHEIGHT=600\n...
-        geometry = {}
-        for line in result.stdout.strip().split('\n'):
-            if '=' in line:
-                key, value = line.split('=', 1)
-                geometry[key] = int(value)
-
-        if all(k in geometry for k in ['X', 'Y', 'WIDTH', 'HEIGHT']):
-            return (geometry['X'], geometry['Y'], geometry['WIDTH'], geometry['HEIGHT'])
+        return get_window_rect(dpy, window)
+    except ConnectionClosedError:
+        _thread_local.display = None
         return None
     except Exception:
         return None
 
-
 def is_claude_window_focused() -> Optional[bool]:
     """
     Check if a Claude Code window is currently focused.
     Returns True/False for definite answer, None if unable to determine.
     """
     try:
-        # Use xdotool to get the active window title
-        result = subprocess.run(
-            ['xdotool', 'getactivewindow', 'getwindowname'],
-            capture_output=True,
-            text=True,
-            timeout=1
-        )
-        if result.returncode == 0:
-            title = result.stdout.strip()
-            return title.startswith(CLAUDE_WINDOW_PREFIX)
-        # Non-zero return code (e.g., no window focused) - treat as not focused
-        return False
-    except subprocess.TimeoutExpired:
-        # Timeout - can't determine, return None
+        # Query the active window title over a persistent X connection
+        # rather than forking xdotool every tick
+        dpy = get_x_display()
+        window = get_active_window(dpy)
+        if window is None:
+            # No window focused - treat as not focused
+            return False
+        title = get_window_title(dpy, window)
+        return bool(title) and title.startswith(CLAUDE_WINDOW_PREFIX)
+    except ConnectionClosedError:
+        # X connection lost - reconnect on the next call
+        _thread_local.display = None
         return None
     except Exception:
-        # Other error - can't determine, return None
+        # Other error (e.g. window closed mid-query) - can't determine
         return None
 
-def find_permission_prompt(reference_images: List[Path]) -> Optional[tuple]:
+def set_claude_focused(claude_focused: Optional[bool]):
     """
-    Search for any of the reference images in the focused window.
-    Returns the center coordinates if found, None otherwise.
+    Record whether a Claude window is focused and update the icon on change.
+    None means focus couldn't be determined and keeps the previous state.
+    """
+    # Polling calls this every tick; a single flag read settles the usual
+    # no-change case without taking the lock
+    if claude_focused is None or state.paused == (not claude_focused):
+        return
+
+    with state.lock:
+        was_paused = state.paused
+        state.paused = not claude_focused
+        if claude_focused:
+            state.focused_event.set()
+        else:
+            state.focused_event.clear()
+        paused = state.paused
+        enabled = state.enabled_event.is_set()
+
+    if was_paused != paused:
+        # Scan at full speed again after a focus change
+        state.idle_ticks = 0
+
+    # Focus changes only matter to the user while auto-approve is on
+    if was_paused != paused and enabled:
+        if paused:
+            print(f"[{time.strftime('%H:%M:%S')}] Paused - Claude window not in focus")
+        else:
+            print(f"[{time.strftime('%H:%M:%S')}] Resumed - Claude window focused")
+        update_indicator_icon()
+
+def prompt_region(rect: tuple) -> tuple:
+    """
+    Narrow a window rectangle to the bottom strip where prompts appear.
+    Returns the whole rectangle while the full window fallback is active.
+    """
+    if state.full_window_scan:
+        return rect
+    x, y, w, h = rect
+    strip = max([PROMPT_HEIGHT_PX] + [4 * pyramid[0].shape[0] for _, pyramid in state.templates])
+    prompt_h = min(h, strip)
+    return (x, y + h - prompt_h, w, prompt_h)
+
+def set_auto_window(rect: Optional[tuple]):
+    """Store the focused Claude window's rectangle, dropping the cached monitor if it moved."""
+    # Title-only focus refreshes leave the rectangle as it was
+    if rect == state.auto_window:
+        return
+    with state.lock:
+        state.auto_window = rect
+        state.monitor = None
+
+def set_full_window_scan(full: bool):
+    """Switch between scanning the prompt strip and the whole focused window."""
+    if full == state.full_window_scan:
+        return
+    with state.lock:
+        state.full_window_scan = full
+        state.monitor = None
+
+def set_custom_region(region: Optional[tuple]):
+    """Store the custom scan region and drop the cached monitor."""
+    with state.lock:
+        state.custom_region = region
+        state.monitor = None
+
+def _ignore_x_error(*_):
+    """X error handler for requests whose failure is harmless."""
+
+def focus_watcher():
+    """
+    Track Claude window focus from X PropertyNotify events.
+    Listens for _NET_ACTIVE_WINDOW changes on the root window and for title
+    changes on the active window, so the scanner never has to poll focus.
+    Also keeps state.auto_window on the focused Claude window as it moves
+    or resizes.
+    Leaves state.focus_events False (polling fallback) if X is unavailable.
+    """
+    try:
+        dpy = get_x_display()
+        root = dpy.screen().root
+        root.change_attributes(event_mask=X.PropertyChangeMask)
+        active_atom = dpy.get_atom('_NET_ACTIVE_WINDOW')
+        title_atoms = {dpy.get_atom('_NET_WM_NAME'), Xatom.WM_NAME}
+    except Exception as e:
+        print(f"Warning: X focus events unavailable, polling instead: {e}")
+        return
+
+    watched = None
+
+    def refresh():
+        nonlocal watched
+        window = get_active_window(dpy)
+        if window != watched:
+            # Follow title and geometry changes on the newly active window only
+            if watched is not None:
+                watched.change_attributes(event_mask=X.NoEventMask, onerror=_ignore_x_error)
+            if window is not None:
+                window.change_attributes(event_mask=X.PropertyChangeMask | X.StructureNotifyMask,
+                                         onerror=_ignore_x_error)
+            watched = window
+        focused = False
+        if window is not None:
+            title = get_window_title(dpy, window)
+            focused = bool(title) and title.startswith(CLAUDE_WINDOW_PREFIX)
+        # Set the region before un-pausing so the first scan uses it, and
+        # pause before clearing it so no scan falls back to the new window
+        if focused:
+            set_auto_window(get_window_rect(dpy, window))
+            set_claude_focused(True)
+        else:
+            set_claude_focused(False)
+            set_auto_window(None)
+
+    try:
+        refresh()
+        state.focus_events = True
+        while state.running:
+            event = dpy.next_event()
+            try:
+                if event.type == X.PropertyNotify:
+                    if ((event.window == root and event.atom == active_atom) or
+                            (event.window == watched and event.atom in title_atoms)):
+                        refresh()
+                elif event.type == X.ConfigureNotify:
+                    # Moved or resized; event coordinates may be relative to
+                    # a window manager frame, so query the root position
+                    if event.window == watched and state.auto_window is not None:
+                        set_auto_window(get_window_rect(dpy, watched))
+            except ConnectionClosedError:
+                raise
+            except Exception:
+                # Window went away mid-query; the next event will settle it
+                continue
+    except Exception as e:
+        print(f"[{time.strftime('%H:%M:%S')}] Focus watcher stopped, polling instead: {e}")
+    finally:
+        state.focus_events = False
+        set_auto_window(None)
+        # Wake a scanner waiting for focus so it switches to polling
+        state.focused_event.set()
+
+def get_scan_region() -> Optional[tuple]:
+    """
+    Get the region to scan as (x, y, width, height).
+    Uses the custom region if set, otherwise the prompt area of the focused
+    window - tracked by focus_watcher, or queried each call without it.
+    Returns None to scan the whole screen.
     """
-    # Use custom region if set, otherwise use focused window geometry
     if state.custom_region:
-        region = state.custom_region
-    else:
-        region = get_focused_window_geometry()
+        return state.custom_region
+    rect = state.auto_window or get_focused_window_geometry()
+    return prompt_region(rect) if rect else None
+
+def get_screen_grabber():
+    """Get the MSS instance owned by the calling thread."""
+    sct = getattr(_thread_local, 'sct', None)
+    if sct is None:
+        sct = _thread_local.sct = mss.MSS()
+    return sct
+
+def result_buffer(screen: np.ndarray, tmpl: np.ndarray) -> np.ndarray:
+    """Get the cached matchTemplate result array for this screen and template size."""
+    rh, rw = screen.shape[:2]
+    th, tw = tmpl.shape[:2]
+    return reuse_buffer(state.result_bufs, (rh, rw, th, tw), (rh - th + 1, rw - tw + 1))
+
+def window_sums(integral: np.ndarray, th: int, tw: int, out: np.ndarray) -> np.ndarray:
+    """Sum every th x tw window of an integral image into out."""
+    np.subtract(integral[th:, tw:], integral[:-th, tw:], out=out)
+    np.subtract(out, integral[th:, :-tw], out=out)
+    return np.add(out, integral[:-th, :-tw], out=out)
+
+def match_coarse(screen: np.ndarray, tmpls: List[np.ndarray]) -> Iterator[np.ndarray]:
+    """
+    Yield TM_CCOEFF_NORMED score maps for same-sized templates, in order.
+    The per-window normalisation depends only on the template size, so it
+    is derived once from the screen's integral images and shared; each
+    template then only costs an unnormalised TM_CCOEFF pass.
+    Every map is written into the same cached array, so each one is only
+    valid until the next is requested.
+    """
+    result = result_buffer(screen, tmpls[0])
+    if len(tmpls) == 1:
+        yield cv2.matchTemplate(screen, tmpls[0], cv2.TM_CCOEFF_NORMED, result=result)
+        return
 
-    for ref_image_path in reference_images:
-        try:
-            location = pyautogui.locateOnScreen(
-                str(ref_image_path),
-                confidence=CONFIDENCE_THRESHOLD,
-                region=region
-            )
+    bufs = state.scan_bufs
+    sh, sw = screen.shape[:2]
+    th, tw = tmpls[0].shape[:2]
+    rows, cols = result.shape
+    area = th * tw
+    sums, sqsums = cv2.integral2(
+        screen,
+        sum=reuse_buffer(bufs, ('sum', sh, sw), (sh + 1, sw + 1), np.float64),
+        sqsum=reuse_buffer(bufs, ('sqsum', sh, sw), (sh + 1, sw + 1), np.float64),
+        sdepth=cv2.CV_64F)
+    win_sum = reuse_buffer(bufs, ('win_sum', rows, cols), result.shape, np.float64)
+    win_norm = reuse_buffer(bufs, ('win_norm', rows, cols), result.shape, np.float64)
+    window_sums(sums, th, tw, out=win_sum)
+    window_sums(sqsums, th, tw, out=win_norm)
+    np.multiply(win_sum, win_sum, out=win_sum)
+    win_sum /= area
+    win_norm -= win_sum
+    np.maximum(win_norm, 0, out=win_norm)
+    np.sqrt(win_norm, out=win_norm)
+    # Flat windows have no defined correlation; score them 0 like OpenCV
+    flat = np.equal(win_norm, 0, out=reuse_buffer(bufs, ('flat', rows, cols), result.shape, bool))
+    textured = np.logical_not(flat, out=reuse_buffer(bufs, ('textured', rows, cols), result.shape, bool))
+    denom = reuse_buffer(bufs, ('denom', rows, cols), result.shape)
+
+    for tmpl in tmpls:
+        np.multiply(win_norm, tmpl.std() * np.sqrt(area), out=denom)
+        ccoeff = cv2.matchTemplate(screen, tmpl, cv2.TM_CCOEFF, result=result)
+        np.divide(ccoeff, denom, out=ccoeff, where=textured)
+        np.copyto(ccoeff, 0, where=flat)
+        yield np.clip(ccoeff, -1, 1, out=ccoeff)
+
+def refine_match(screen: np.ndarray, tmpl: np.ndarray,
+                 coarse_loc: tuple, level: int) -> Optional[tuple]:
+    """
+    Confirm a coarse candidate at full resolution.
+    Searches a small window around the candidate scaled up from the given
+    pyramid level. Returns the top-left corner of the match, or None.
+    """
+    th, tw = tmpl.shape[:2]
+
+    # Leave slack for the rounding introduced by each pyrDown
+    scale = 1 << level
+    margin = 2 * scale
+    x0 = max(0, coarse_loc[0] * scale - margin)
+    y0 = max(0, coarse_loc[1] * scale - margin)
+    x1 = min(screen.shape[1], coarse_loc[0] * scale + tw + margin)
+    y1 = min(screen.shape[0], coarse_loc[1] * scale + th + margin)
+    if x1 - x0 < tw or y1 - y0 < th:
+        return None
+
+    roi = screen[y0:y1, x0:x1]
+    result = cv2.matchTemplate(roi, tmpl, cv2.TM_CCOEFF_NORMED, result=result_buffer(roi, tmpl))
+    _, max_val, _, max_loc = cv2.minMaxLoc(result)
+
+    if max_val >= CONFIDENCE_THRESHOLD:
+        return (x0 + max_loc[0], y0 + max_loc[1])
+    return None
+
+def match_group(screen_pyramid: List[np.ndarray],
+                group: List[Tuple[str, List[np.ndarray]]]) -> Optional[tuple]:
+    """
+    Coarse-to-fine search for a group of same-sized templates.
+    The coarsest level shared with the screen pyramid is searched in full
+    for every template, then each template's best candidate is confirmed
+    at full resolution. Returns (name, top-left corner) of the first
+    confirmed match, or None.
+    """
+    level = min(len(screen_pyramid), len(group[0][1])) - 1
+    coarse_screen = screen_pyramid[level]
+    coarse_tmpls = [pyramid[level] for _, pyramid in group]
+    th, tw = coarse_tmpls[0].shape[:2]
+    if th > coarse_screen.shape[0] or tw > coarse_screen.shape[1]:
+        return None
 
+    scores = match_coarse(coarse_screen, coarse_tmpls)
+
+    for (name, pyramid), score in zip(group, scores):
+        _, max_val, _, max_loc = cv2.minMaxLoc(score)
+
+        if level == 0:
+            if max_val >= CONFIDENCE_THRESHOLD:
+                return (name, max_loc)
+        elif max_val >= COARSE_CONFIDENCE_THRESHOLD:
+            location = refine_match(screen_pyramid[0], pyramid[0], max_loc, level)
             if location:
-                center = pyautogui.center(location)
-                return (center.x, center.y)
+                return (name, location)
+
+    return None
+
+def exact_probes(tmpl: np.ndarray) -> np.ndarray:
+    """
+    List a template's pixels as (y, x, value) rows, most distinctive first.
+    Pixels far from the template's background shade are the ones a wrong
+    position gets wrong, so checking them first rejects it soonest.
+    """
+    ys, xs = np.indices(tmpl.shape[:2])
+    distinct = np.abs(tmpl.astype(np.int64) - int(np.median(tmpl))).ravel()
+    order = np.argsort(-distinct, kind='stable')
+    return np.stack([ys.ravel()[order], xs.ravel()[order], tmpl.ravel()[order]], axis=1)
+
+def probes_match(screen: np.ndarray, probes: np.ndarray, x: int, y: int, tolerance: int) -> bool:
+    """Check that every probe pixel at offset (x, y) is within tolerance."""
+    for i in range(probes.shape[0]):
+        pixel = np.int64(screen[y + probes[i, 0], x + probes[i, 1]])
+        if abs(pixel - probes[i, 2]) > tolerance:
+            return False
+    return True
+
+def find_exact(screen: np.ndarray, probes: np.ndarray, th: int, tw: int,
+               tolerance: int) -> Tuple[int, int]:
+    """
+    Find the first position where every template pixel is within tolerance
+    of the screen. Wrong positions almost always fail on the first probe.
+    Rows are searched in parallel when compiled with numba.
+    Returns the top-left corner, or (-1, -1).
+    """
+    rows = screen.shape[0] - th + 1
+    cols = screen.shape[1] - tw + 1
+    first_x = np.full(max(rows, 0), -1, dtype=np.int64)
+
+    for y in prange(rows):
+        for x in range(cols):
+            if probes_match(screen, probes, x, y, tolerance):
+                first_x[y] = x
+                break
+
+    for y in range(rows):
+        if first_x[y] >= 0:
+            return (first_x[y], y)
+    return (-1, -1)
+
+if HAS_NUMBA:
+    # Compiled without the GIL so the GTK main loop and focus watcher keep
+    # running during a search, as they already do during OpenCV calls
+    probes_match = numba.njit(cache=True, nogil=True)(probes_match)
+    find_exact = numba.njit(parallel=True, cache=True, nogil=True)(find_exact)
+
+def find_exact_cv(screen: np.ndarray, tmpl: np.ndarray, probes: np.ndarray,
+                  tolerance: int) -> Tuple[int, int]:
+    """
+    OpenCV version of find_exact for when numba isn't installed.
+    The most distinctive probe pixels are first compared at every position
+    at once with cv2.absdiff, which rejects nearly all positions; the few
+    survivors get a full-template absdiff. Returns the top-left corner of
+    the first match in row order, or (-1, -1).
+    """
+    th, tw = tmpl.shape[:2]
+    rows = screen.shape[0] - th + 1
+    cols = screen.shape[1] - tw + 1
+
+    candidates = None
+    for py, px, value in probes[:EXACT_PREFILTER_PROBES]:
+        diff = cv2.absdiff(screen[py:py + rows, px:px + cols], int(value))
+        close = diff <= tolerance
+        candidates = close if candidates is None else np.logical_and(candidates, close, out=candidates)
+        if not candidates.any():
+            return (-1, -1)
+
+    for y, x in zip(*np.nonzero(candidates)):
+        if cv2.absdiff(screen[y:y + th, x:x + tw], tmpl).max() <= tolerance:
+            return (int(x), int(y))
+    return (-1, -1)
+
+def build_scan_monitor(sct, region: Optional[tuple]) -> Optional[Dict[str, int]]:
+    """
+    Cache the MSS monitor dict for region, or the whole screen if None.
+    The region is clipped to the screen, since MSS refuses to grab outside
+    it. Returns None if none of it is on screen.
+    """
+    screen = sct.monitors[0]
+    state.scan_region = region
+    if region:
+        x, y, w, h = region
+        left = max(x, screen['left'])
+        top = max(y, screen['top'])
+        right = min(x + w, screen['left'] + screen['width'])
+        bottom = min(y + h, screen['top'] + screen['height'])
+        if right <= left or bottom <= top:
+            state.monitor = None
+            return None
+        state.monitor = {'left': left, 'top': top, 'width': right - left, 'height': bottom - top}
+    else:
+        state.monitor = screen
+    state.last_frame_hash = None
+    # Scratch arrays are sized for the old region
+    state.result_bufs.clear()
+    state.scan_bufs.clear()
+    return state.monitor
+
+def get_scan_monitor(sct) -> Optional[Dict[str, int]]:
+    """
+    Get the MSS monitor dict to grab, or None if the region is off screen.
+    Custom and focus-tracked regions only change through set_custom_region,
+    set_auto_window and set_full_window_scan, which drop the cached dict,
+    so it is returned as is until then. Without either, the focused window
+    is polled each grab.
+    """
+    monitor = state.monitor
+    if monitor is not None and (state.custom_region or state.focus_events):
+        return monitor
 
-        except pyautogui.ImageNotFoundException:
+    # Rebuild under the lock so a region change mid-build isn't overwritten
+    with state.lock:
+        if state.custom_region:
+            return build_scan_monitor(sct, state.custom_region)
+        if state.auto_window:
+            return build_scan_monitor(sct, prompt_region(state.auto_window))
+        if state.focus_events:
+            # No Claude window is focused; the focused window must not be scanned
+            return None
+
+    region = get_scan_region()
+    if monitor is None or region != state.scan_region:
+        monitor = build_scan_monitor(sct, region)
+    return monitor
+
+def report_capture_path(sct):
+    """Log whether MSS is grabbing through MIT-SHM shared memory."""
+    state.capture_reported = True
+    # Only filled in after the first grab
+    notes = "; ".join(sct.performance_status) or "no MIT-SHM status reported"
+    print(f"[{time.strftime('%H:%M:%S')}] Screen capture: {notes}")
+
+def warm_up_capture():
+    """Open this thread's X and MSS connections ahead of the first real scan."""
+    try:
+        get_x_display()
+        grab_scan_frame()
+    except Exception as e:
+        print(f"Warning: Screen capture warm-up failed: {e}")
+
+def grab_scan_frame() -> Optional[tuple]:
+    """Grab the scan region. Returns (monitor, screenshot), or None if it is off screen."""
+    sct = get_screen_grabber()
+    monitor = get_scan_monitor(sct)
+    if monitor is None:
+        return None
+    try:
+        raw = sct.grab(monitor)
+    except ScreenShotError:
+        # MSS sizes its buffers and monitor list for the screen as it was
+        # when created; after a resolution change, start over on both
+        _thread_local.sct = None
+        with state.lock:
+            state.monitor = None
+        sct.close()
+        raise
+    if not state.capture_reported:
+        report_capture_path(sct)
+    return monitor, raw
+
+def find_permission_prompt(frame: Optional[tuple] = None) -> Optional[tuple]:
+    """
+    Search for any of the reference templates in the focused window.
+    frame is a (monitor, screenshot) pair from grab_scan_frame; the region
+    is grabbed now if not given.
+    Returns the center coordinates if found, None otherwise.
+    """
+    # Grab the region once and match every template against its pyramid.
+    # The BGRA buffer is wrapped in place rather than converted via .rgb
+    frame = frame or grab_scan_frame()
+    if frame is None:
+        # None of the scan region is on screen
+        return None
+    monitor, raw = frame
+
+    # An unchanged frame can't contain a prompt the last scan missed
+    frame_hash = hash_frame(raw.raw)
+    if frame_hash == state.last_frame_hash:
+        return None
+
+    screen = np.frombuffer(raw.raw, dtype=np.uint8).reshape(raw.height, raw.width, 4)
+    gray = reuse_buffer(state.scan_bufs, ('gray', raw.height, raw.width),
+                        (raw.height, raw.width), np.uint8)
+    if GREEN_AS_GRAY:
+        screen = cv2.extractChannel(screen, 1, dst=gray)
+    else:
+        screen = cv2.cvtColor(screen, cv2.COLOR_BGRA2GRAY, dst=gray)
+
+    if state.exact_match:
+        return find_exact_prompt(monitor, screen, frame_hash)
+
+    screen_pyramid = build_pyramid(screen, state.pyramid_levels, bufs=state.scan_bufs)
+
+    for group in state.template_groups:
+        try:
+            match = match_group(screen_pyramid, group)
+
+            if match:
+                # Forget the frame so a prompt that survives the Enter
+                # keypress is matched again after the cooldown
+                state.last_frame_hash = None
+                _, location = match
+                th, tw = group[0][1][0].shape[:2]
+                return (monitor['left'] + location[0] + tw // 2,
+                        monitor['top'] + location[1] + th // 2)
+
+        except cv2.error as e:
+            names = ", ".join(name for name, _ in group)
+            print(f"Error scanning for {names}: {e}")
             continue
-        except Exception as e:
-            print(f"Error scanning for {ref_image_path.name}: {e}")
+
+    state.last_frame_hash = frame_hash
+    return None
+
+def find_exact_prompt(monitor: Dict[str, int], screen: np.ndarray,
+                      frame_hash: int) -> Optional[tuple]:
+    """
+    EXACT_MATCH variant of the template search in find_permission_prompt.
+    Returns the center coordinates if found, None otherwise.
+    """
+    for (name, tmpl_pyramid), probes in zip(state.templates, state.exact_probes):
+        th, tw = tmpl_pyramid[0].shape[:2]
+        if th > screen.shape[0] or tw > screen.shape[1]:
             continue
 
+        if HAS_NUMBA:
+            x, y = find_exact(screen, probes, th, tw, EXACT_MATCH_TOLERANCE)
+        else:
+            x, y = find_exact_cv(screen, tmpl_pyramid[0], probes, EXACT_MATCH_TOLERANCE)
+        if x >= 0:
+            state.last_frame_hash = None
+            return (monitor['left'] + x + tw // 2,
+                    monitor['top'] + y + th // 2)
+
+    state.last_frame_hash = frame_hash
     return None
 
+def find_approval_sound() -> Optional[str]:
+    """Get the first installed system sound to play on approval, or None."""
+    sound_paths = [
+        "/usr/share/sounds/freedesktop/stereo/complete.oga",
+        "/usr/share/sounds/freedesktop/stereo/message.oga",
+        "/usr/share/sounds/gnome/default/alerts/drip.ogg",
+        "/usr/share/sounds/sound-icons/prompt.wav",
+    ]
+    for sound_path in sound_paths:
+        if os.path.exists(sound_path):
+            return sound_path
+    return None
+
+def open_canberra() -> Optional[tuple]:
+    """
+    Open a libcanberra context for playing sounds in-process.
+    The context keeps its sound server connection open between plays.
+    Returns (library, context), or None if libcanberra isn't available.
+    """
+    name = ctypes.util.find_library('canberra')
+    if not name:
+        return None
+    try:
+        lib = ctypes.CDLL(name)
+        context = ctypes.c_void_p()
+        if lib.ca_context_create(ctypes.byref(context)) != 0:
+            return None
+        return lib, context
+    except (OSError, AttributeError):
+        return None
+
+def setup_sound():
+    """Resolve the approval sound and its player once, before scanning starts."""
+    state.sound_path = find_approval_sound()
+    if state.sound_path:
+        state.canberra = open_canberra()
+        player = "libcanberra" if state.canberra else "paplay"
+        print(f"Approval sound: {os.path.basename(state.sound_path)} via {player}")
+    else:
+        print("Approval sound: no system sound found, using terminal bell")
+
 def play_approval_sound():
     """Play a sound to indicate auto-approval."""
     if not SOUND_ENABLED:
         return
     try:
-        # Try using paplay (PulseAudio) with system sounds
-        sound_paths = [
-            "/usr/share/sounds/freedesktop/stereo/complete.oga",
-            "/usr/share/sounds/freedesktop/stereo/message.oga",
-            "/usr/share/sounds/gnome/default/alerts/drip.ogg",
-            "/usr/share/sounds/sound-icons/prompt.wav",
-        ]
-
-        for sound_path in sound_paths:
-            if os.path.exists(sound_path):
-                subprocess.Popen(
-                    ['paplay', sound_path],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL
-                )
+        if not state.sound_path:
+            # Fallback: terminal bell
+            print('\a', end='', flush=True)
+            return
+
+        if state.canberra:
+            lib, context = state.canberra
+            if lib.ca_context_play(context, 0, b"media.filename",
+                                   state.sound_path.encode(), None) == 0:
                 return
 
-        # Fallback: terminal bell
-        print('\a', end='', flush=True)
+        # Try using paplay (PulseAudio)
+        subprocess.Popen(
+            ['paplay', state.sound_path],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
 
     except Exception:
         # Silent fallback
         pass
 
 def send_enter_key():
-    """Send Enter keypress to approve the prompt."""
-    pyautogui.press('enter')
+    """Send Enter keypress to approve the prompt, injected through XTEST."""
+    for attempt in range(2):
+        try:
+            dpy = get_x_display()
+            keycode = dpy.keysym_to_keycode(XK.XK_Return)
+            dpy.xtest_fake_input(X.KeyPress, keycode)
+            dpy.xtest_fake_input(X.KeyRelease, keycode)
+            # Wait for the server to process both events before returning
+            dpy.sync()
+            return
+        except ConnectionClosedError:
+            # X connection lost - retry once on a fresh one
+            _thread_local.display = None
+            if attempt:
+                raise
 
 def select_capture_area() -> Optional[tuple]:
     """
@@ -403,33 +1095,40 @@ def select_capture_area() -> Optional[tuple]:
 # INDICATOR (SYSTEM TRAY)
 # ============================================================================
 
+def get_indicator_color() -> str:
+    """Get the indicator color for the current state. Call with state.lock held."""
+    if not state.enabled_event.is_set():
+        return 'red'
+    return 'yellow' if state.paused else 'green'
+
 def update_indicator_icon():
-    """Update the indicator icon based on current state."""
+    """
+    Update the indicator icon based on current state.
+    Does nothing if the icon already shows the current state; calls made
+    while an update is still queued are folded into it.
+    """
     if not HAS_INDICATOR or not state.indicator:
         return
 
-    # Capture state NOW before scheduling GTK update (fixes race condition)
     with state.lock:
-        enabled = state.enabled
-        paused = state.paused
+        if state.icon_update_pending or get_indicator_color() == state.indicator_color:
+            return
+        state.icon_update_pending = True
 
-    # Determine color and status text based on captured state
-    if not enabled:
-        color = 'red'
-        status_text = "Status: Disabled"
-    elif paused:
-        color = 'yellow'
-        status_text = "Status: Paused (Claude not focused)"
-    else:
-        color = 'green'
-        status_text = "Status: Active"
+    def do_update():
+        # Clear the flag before reading so a change from here on queues
+        # another update instead of being lost
+        with state.lock:
+            state.icon_update_pending = False
+            color = get_indicator_color()
+            if color == state.indicator_color:
+                return
+            state.indicator_color = color
 
-    def do_update(color=color, status_text=status_text):
-        icon_path = str(CONFIG_DIR / "icons" / f"circle_{color}.png")
-        state.indicator.set_icon_full(icon_path, f"Claude Drinking Bird - {color}")
+        state.indicator.set_icon_full(state.icon_paths[color], f"Claude Drinking Bird - {color}")
 
         if state.status_item:
-            state.status_item.set_label(status_text)
+            state.status_item.set_label(STATUS_TEXTS[color])
 
     GLib.idle_add(do_update)
 
@@ -447,37 +1146,36 @@ def on_quit_clicked(_):
 def on_set_capture_area_clicked(_):
     """Handle set capture area button."""
     # Temporarily disable scanning
-    was_enabled = state.enabled
-    with state.lock:
-        state.enabled = False
+    was_enabled = state.enabled_event.is_set()
+    state.enabled_event.clear()
     update_indicator_icon()
 
     # Run slop in a separate thread to not block GTK
     def do_selection():
         region = select_capture_area()
         if region:
-            state.custom_region = region
+            set_custom_region(region)
             # Save to config
             config = load_config()
             config['scan_region'] = list(region)
             save_config(config)
             print(f"[{time.strftime('%H:%M:%S')}] Capture area set to: {region}")
             # Update menu item
-            GLib.idle_add(update_capture_area_menu)
+            update_capture_area_menu()
         else:
             print(f"[{time.strftime('%H:%M:%S')}] Capture area unchanged")
 
         # Restore previous enabled state
-        with state.lock:
-            state.enabled = was_enabled
-        GLib.idle_add(update_indicator_icon)
+        if was_enabled:
+            state.enabled_event.set()
+        update_indicator_icon()
 
     thread = threading.Thread(target=do_selection, daemon=True)
     thread.start()
 
 def on_reset_capture_area_clicked(_):
     """Handle reset capture area button."""
-    state.custom_region = None
+    set_custom_region(None)
     config = load_config()
     if 'scan_region' in config:
         del config['scan_region']
@@ -486,14 +1184,31 @@ def on_reset_capture_area_clicked(_):
     update_capture_area_menu()
 
 def update_capture_area_menu():
-    """Update the capture area menu item text."""
-    if state.capture_area_item:
-        if state.custom_region:
-            x, y, w, h = state.custom_region
+    """
+    Update the capture area menu item text.
+    Calls made while an update is still queued are folded into it.
+    """
+    if not state.capture_area_item:
+        return
+
+    with state.lock:
+        if state.menu_update_pending:
+            return
+        state.menu_update_pending = True
+
+    def do_update():
+        with state.lock:
+            state.menu_update_pending = False
+            region = state.custom_region
+
+        if region:
+            x, y, w, h = region
             state.capture_area_item.set_label(f"Capture Area: {w}x{h} at ({x},{y})")
         else:
             state.capture_area_item.set_label("Capture Area: Default")
 
+    GLib.idle_add(do_update)
+
 def create_indicator():
     """Create the AppIndicator for the system tray."""
     if not HAS_INDICATOR:
@@ -501,14 +1216,13 @@ def create_indicator():
 
     ensure_icons_exist()
 
-    icon_path = str(CONFIG_DIR / "icons" / "circle_red.png")
-
     indicator = AppIndicator3.Indicator.new(
         "claude-drinking-bird",
-        icon_path,
+        state.icon_paths['red'],
         AppIndicator3.IndicatorCategory.APPLICATION_STATUS
     )
 
+    state.indicator_color = 'red'
     indicator.set_status(AppIndicator3.IndicatorStatus.ACTIVE)
     indicator.set_title("Claude Drinking Bird")
 
@@ -516,7 +1230,7 @@ def create_indicator():
     menu = Gtk.Menu()
 
     # Status item (non-clickable)
-    status_item = Gtk.MenuItem(label="Status: Disabled")
+    status_item = Gtk.MenuItem(label=STATUS_TEXTS['red'])
     status_item.set_sensitive(False)
     menu.append(status_item)
     state.status_item = status_item
@@ -566,51 +1280,61 @@ def create_indicator():
 # MAIN LOOP
 # ============================================================================
 
-def scanner_loop(reference_images: List[Path]):
+def get_idle_scan_interval() -> float:
+    """Get the delay in seconds before the next scan after an empty one."""
+    backoff = min(max(state.idle_ticks - IDLE_BACKOFF_TICKS, 0), 8)
+    return min(SCAN_INTERVAL_MS * IDLE_BACKOFF_FACTOR ** backoff, MAX_SCAN_INTERVAL_MS) / 1000
+
+def scanner_loop():
     """Main scanning loop running in a background thread."""
     print(f"[{time.strftime('%H:%M:%S')}] Scanner started (disabled by default)")
-    print(f"  - Monitoring {len(reference_images)} reference image(s)")
-    print(f"  - Scan interval: {SCAN_INTERVAL_MS}ms")
-    print(f"  - Confidence threshold: {CONFIDENCE_THRESHOLD}")
+    print(f"  - Monitoring {len(state.templates)} reference image(s)")
+    print(f"  - Scan interval: {SCAN_INTERVAL_MS}ms (up to {MAX_SCAN_INTERVAL_MS}ms when idle)")
+    print(f"  - Confidence threshold: {CONFIDENCE_THRESHOLD} "
+          f"(coarse {COARSE_CONFIDENCE_THRESHOLD} at 1/{1 << PYRAMID_LEVELS} scale)")
     print(f"  - Cooldown: {COOLDOWN_SECONDS}s")
 
     if state.custom_region:
         x, y, w, h = state.custom_region
         print(f"  - Scan area: custom region {w}x{h} at ({x},{y})")
     else:
-        print(f"  - Scan area: focused window")
+        print(f"  - Scan area: bottom {PROMPT_HEIGHT_PX}px of focused window "
+              f"(whole window every {FULL_WINDOW_SCAN_MISSES} empty scans)")
 
     print(f"\nClick the system tray icon to enable. Press Ctrl+C to exit.\n")
 
-    while state.running:
-        try:
-            with state.lock:
-                enabled = state.enabled
-
-            if not enabled:
-                time.sleep(SCAN_INTERVAL_MS / 1000)
-                continue
-
-            # Check if Claude window is focused
-            claude_focused = is_claude_window_focused()
+    # Grabs the next frame while focus is being polled
+    grab_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="grab")
 
-            with state.lock:
-                was_paused = state.paused
-                # Only update pause state if we got a definite answer
-                # If None (couldn't determine), keep previous state
-                if claude_focused is not None:
-                    state.paused = not claude_focused
+    # Connections are per thread, so set up the ones that will grab now
+    # rather than on the first scan after enabling. The grab worker is only
+    # used while focus is polled. One after the other, so they don't race
+    # on the cached monitor or both log the capture path
+    if not state.focus_events:
+        grab_pool.submit(warm_up_capture).result()
+    warm_up_capture()
 
-            # Update icon if pause state changed
-            if was_paused != state.paused:
-                if state.paused:
-                    print(f"[{time.strftime('%H:%M:%S')}] Paused - Claude window not in focus")
-                else:
-                    print(f"[{time.strftime('%H:%M:%S')}] Resumed - Claude window focused")
-                update_indicator_icon()
+    while state.running:
+        try:
+            # Block without waking up while disabled
+            state.enabled_event.wait()
+
+            # Poll focus only when the focus watcher isn't delivering events.
+            # The frame is grabbed alongside, so a tick costs the slower of
+            # the two rather than both; it is dropped if focus was lost
+            frame = None
+            if not state.focus_events:
+                frame_future = None if state.paused else grab_pool.submit(grab_scan_frame)
+                set_claude_focused(is_claude_window_focused())
+                if frame_future:
+                    frame = frame_future.result()
 
             if state.paused:
-                time.sleep(SCAN_INTERVAL_MS / 1000)
+                if state.focus_events:
+                    # The focus watcher wakes us when a Claude window is focused
+                    state.focused_event.wait()
+                else:
+                    time.sleep(SCAN_INTERVAL_MS / 1000)
                 continue
 
             # Check cooldown
@@ -619,11 +1343,23 @@ def scanner_loop(reference_images: List[Path]):
                 time.sleep(SCAN_INTERVAL_MS / 1000)
                 continue
 
+            # While the prompt strip stays empty, check the whole window once
+            # every FULL_WINDOW_SCAN_MISSES scans in case the layout moved the
+            # prompt, then go back to the strip. A custom region is scanned
+            # as is, so leave its cached monitor alone
+            set_full_window_scan(not state.custom_region and state.idle_ticks > 0 and
+                                 state.idle_ticks % FULL_WINDOW_SCAN_MISSES == 0)
+
             # Scan for permission prompt
-            location = find_permission_prompt(reference_images)
+            location = find_permission_prompt(frame)
+
+            if location and state.paused:
+                # Focus moved away during the scan; Enter would go elsewhere
+                continue
 
             if location:
                 print(f"[{time.strftime('%H:%M:%S')}] Permission prompt detected at {location}")
+                state.idle_ticks = 0
 
                 # Send Enter to approve
                 send_enter_key()
@@ -636,7 +1372,8 @@ def scanner_loop(reference_images: List[Path]):
                 # Wait for cooldown before next scan
                 time.sleep(COOLDOWN_SECONDS)
             else:
-                time.sleep(SCAN_INTERVAL_MS / 1000)
+                state.idle_ticks += 1
+                time.sleep(get_idle_scan_interval())
 
         except Exception as e:
             print(f"[{time.strftime('%H:%M:%S')}] Scanner error: {e}")
@@ -647,6 +1384,12 @@ def main():
     print("Claude Drinking Bird")
     print("=" * 40)
 
+    # mss.MSS and its MIT-SHM capture path only exist from mss 10.2
+    if not hasattr(mss, 'MSS'):
+        print(f"mss {mss.__version__} is too old, upgrade to 10.2 or newer: "
+              f"pip install -r requirements.txt")
+        sys.exit(1)
+
     # Ensure config directory exists
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -671,6 +1414,28 @@ def main():
     for img in reference_images:
         print(f"  - {img.name}")
 
+    state.templates = load_templates(reference_images)
+    if not state.templates:
+        print("No usable reference images. Exiting.")
+        sys.exit(1)
+    # Small templates stop short of PYRAMID_LEVELS; don't downsample the
+    # screen further than any of them can be matched at
+    state.pyramid_levels = max(len(pyramid) for _, pyramid in state.templates) - 1
+    state.template_groups = group_templates(state.templates)
+
+    if EXACT_MATCH:
+        state.exact_probes = [exact_probes(pyramid[0]) for _, pyramid in state.templates]
+        state.exact_match = True
+        if HAS_NUMBA:
+            # Compile the kernel now rather than on the first real scan,
+            # on a screen the template's size, so every probe stays in bounds
+            print("Compiling exact-match kernel...")
+            tmpl = state.templates[0][1][0]
+            find_exact(np.zeros_like(tmpl), state.exact_probes[0], *tmpl.shape[:2], 0)
+
+    if SOUND_ENABLED:
+        setup_sound()
+
     # Set up signal handler for graceful shutdown
     def signal_handler(sig, frame):
         print(f"\n[{time.strftime('%H:%M:%S')}] Received interrupt signal")
@@ -688,8 +1453,11 @@ def main():
         if state.custom_region:
             update_capture_area_menu()
 
-    # Start scanner thread
-    scanner_thread = threading.Thread(target=scanner_loop, args=(reference_images,), daemon=True)
+    # Start focus tracking and scanner threads
+    focus_thread = threading.Thread(target=focus_watcher, daemon=True)
+    focus_thread.start()
+
+    scanner_thread = threading.Thread(target=scanner_loop, daemon=True)
     scanner_thread.start()
 
     # Run GTK main loop (or simple loop if no indicator)
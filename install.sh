@@ -33,8 +33,6 @@ sudo apt install -y \
     python3-gi \
     gir1.2-appindicator3-0.1 \
     libgirepository1.0-dev \
-    scrot \
-    xdotool \
     slop \
     pulseaudio-utils
 